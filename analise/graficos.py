@@ -1,99 +1,103 @@
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import pandas as pd
 import numpy as np
-import json
-from collections import defaultdict
-from scipy.interpolate import CubicSpline, interp1d
+import orjson
+from numba import njit
+from joblib import Parallel, delayed
 from scipy.signal import savgol_filter
-from scipy import stats
+import math
 import os
 
 source = input()
-with open(source, 'r') as f:
-    records = json.load(f)
+with open(source, 'rb') as f:
+    records = orjson.loads(f.read())
 
 # Criar DataFrame
 df = pd.DataFrame(records)
 
-# Converter durações para segundos (assumindo que Duration é em nanosegundos)
-df['durations_nano'] = df['durations'].apply(
-    lambda x: [d['secs'] * 1e9+ d['nanos']  if isinstance(d, dict) else d  for d in x]
+# Calcular médias (menor medição de cada registro, em nanosegundos)
+df['avg_duration'] = np.fromiter(
+    (min(d['secs'] * 1_000_000_000 + d['nanos'] for d in record['durations']) for record in records),
+    dtype=np.int64,
+    count=len(records)
 )
 
-# Calcular médias
-df['avg_duration'] = df['durations_nano'].apply(lambda x: np.min(x))
-
 df['k'] = df['population'] 
 # Agrupar dados
 grouped = df.groupby(['operation', 'matrix_type', 'occupation','k', 'size'])['avg_duration'].mean().reset_index()
 
-# Configurar gráfico
-plt.figure(figsize=(12, 8))
-
-# Gerar combinações únicas de operação e matrix_type
-operations = df['operation'].unique()
-matrix_types = df['matrix_type'].unique()
-
-def rolling_outlier_filter(df, column='f', sorted_by='k', n=3, threshold=2):
+def rolling_outlier_filter(df, column='f', sorted_by='k', n=3, threshold=2, already_sorted=False):
     """
     Remove pontos que estão a mais de 'threshold' desvios padrão 
-    da média dos n pontos à esquerda e n pontos à direita
+    da média dos n pontos à esquerda e n pontos à direita.
+    Com already_sorted=True, df já deve estar ordenado por 'sorted_by'
     """
-    df = df.copy().sort_values(sorted_by).reset_index(drop=True)
-    outliers_mask = pd.Series([False] * len(df))
-    
-    for i in range(len(df)):
-        # Definir janela: n pontos à esquerda e n pontos à direita
-        left_start = max(0, i - n)
-        left_end = max(0, i - 1)  # Não incluir o ponto atual
-        right_start = min(len(df) - 1, i + 1)
-        right_end = min(len(df) - 1, i + n)
-        
-        # Coletar pontos da janela (excluindo o ponto atual)
-        window_indices = list(range(left_start, left_end + 1)) + list(range(right_start, right_end + 1))
-        window_values = df.iloc[window_indices][column]
-        
-        # Calcular estatísticas da janela (excluindo NaN)
-        if len(window_values) > 1:
-            mean_val = window_values.mean()
-            std_val = window_values.std()
-            
-            # Verificar se o ponto atual é outlier
-            if std_val > 0:  # Evitar divisão por zero
-                current_value = df.iloc[i][column]
-                z_score = abs(current_value - mean_val) / std_val
-                if z_score > threshold:
-                    outliers_mask.iloc[i] = True
-    
-    print(f"Removidos {outliers_mask.sum()} outliers de {len(df)} pontos")
-    return df[~outliers_mask]
-def lim_inf_filter(df, column='f', sorted_by='k', n=3, threshold=2):
-    df = df.copy().sort_values(sorted_by).reset_index(drop=True)
-    outliers_mask = pd.Series([False] * len(df))
-    min_value = df.iloc[len(df)-1][column]
-    for i in range(len(df)-1, -1, -1):  # Evitar divisão por zero
-        current_value = df.iloc[i][column]
-        if current_value < min_value:
-            min_value = current_value
-        else:
-            outliers_mask.iloc[i] = True
-    print(f"Removidos {outliers_mask.sum()} outliers de {len(df)} pontos")
-            
-    return df[~outliers_mask]
+    if not already_sorted:
+        df = df.sort_values(sorted_by).reset_index(drop=True)
+    values = df[column].to_numpy(dtype=np.float64)
+    outliers_mask = np.zeros(len(values), dtype=bool)
+
+    if len(values) > 0:
+        # Janelas de 2n+1 pontos centradas em cada ponto; peso 0 fora dos dados
+        width = 2 * n + 1
+        windows = np.lib.stride_tricks.sliding_window_view(np.pad(values, n), width)
+        weights = np.lib.stride_tricks.sliding_window_view(np.pad(np.ones(len(values)), n), width).copy()
+        # Excluir o ponto atual, exceto no primeiro e no último (comportamento original)
+        weights[:, n] = 0
+        weights[0, n] += 1
+        weights[-1, n] += 1
+
+        # Média e desvio padrão amostral em duas passadas (estável para valores grandes)
+        count = weights.sum(axis=1)
+        mean_val = (weights * windows).sum(axis=1) / count
+        deviation = windows - mean_val[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std_val = np.sqrt((weights * deviation ** 2).sum(axis=1) / (count - 1))
+            z_score = np.abs(values - mean_val) / std_val
+        outliers_mask = (count > 1) & (std_val > 0) & (z_score > threshold)
 
-def lim_sup_filter(df, column='f', sorted_by='k', n=3, threshold=2):
-    df = df.copy().sort_values(sorted_by).reset_index(drop=True)
-    outliers_mask = pd.Series([False] * len(df))
-    max_value = df.iloc[0][column]
-    for i in range(len(df)):  # Evitar divisão por zero
-        current_value = df.iloc[i][column]
-        if current_value > max_value:
-            max_value = current_value
-        else:
-            outliers_mask.iloc[i] = True
     print(f"Removidos {outliers_mask.sum()} outliers de {len(df)} pontos")
-            
     return df[~outliers_mask]
+def lim_inf_filter(df, column='f', sorted_by='k', n=3, threshold=2, already_sorted=False):
+    if not already_sorted:
+        df = df.sort_values(sorted_by).reset_index(drop=True)
+    # Mantém apenas os pontos estritamente menores que todos os pontos à direita
+    values = df[column].to_numpy()
+    keep = np.zeros(len(values), dtype=bool)
+    if len(values) > 1:
+        running_min = np.minimum.accumulate(values[::-1])[::-1]
+        keep[:-1] = values[:-1] < running_min[1:]
+    print(f"Removidos {len(df) - keep.sum()} outliers de {len(df)} pontos")
+
+    return df[keep]
+
+def lim_sup_filter(df, column='f', sorted_by='k', n=3, threshold=2, already_sorted=False):
+    if not already_sorted:
+        df = df.sort_values(sorted_by).reset_index(drop=True)
+    # Mantém apenas os pontos estritamente maiores que todos os pontos à esquerda
+    values = df[column].to_numpy()
+    keep = np.zeros(len(values), dtype=bool)
+    if len(values) > 1:
+        running_max = np.maximum.accumulate(values)
+        keep[1:] = values[1:] > running_max[:-1]
+    print(f"Removidos {len(df) - keep.sum()} outliers de {len(df)} pontos")
+
+    return df[keep]
+def fast_linregress(x, y):
+    """
+    Regressão linear por mínimos quadrados, retornando apenas (slope, intercept, r)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    dx = x - x.mean()
+    dy = y - y.mean()
+    sxx = (dx * dx).sum()
+    sxy = (dx * dy).sum()
+    syy = (dy * dy).sum()
+    slope = sxy / sxx
+    intercept = y.mean() - slope * x.mean()
+    r = sxy / np.sqrt(sxx * syy)
+    return slope, intercept, r
 def plot_smooth_curve(x, y, window_length=7, polyorder=3):
     if len(y) < window_length:
         window_length = len(y) if len(y) % 2 != 0 else len(y) - 1
@@ -101,18 +105,6 @@ def plot_smooth_curve(x, y, window_length=7, polyorder=3):
         return y  # Não é possível suavizar com menos de 3 pontos
     return savgol_filter(y, window_length, polyorder)
 # Plotar linhas para cada combinação
-assintoc_functions = {
-    '0-constant': lambda k:  1,
-    '1-log': lambda k:  np.log(k),
-    '05-sqrt': lambda k:  np.sqrt(k),
-    '2-linear': lambda k:  k,
-    '3-nlog': lambda k: k * np.log(k) ,
-    '4-nsqrt': lambda k: k *np.sqrt(k) ,
-    '5-nlogsqrt': lambda k: k * np.log(k)*np.sqrt(k) ,
-    '6-quadratic': lambda k: k**2,
-    '7-quadratic-sqrt': lambda k: k**2 * np.sqrt(k),
-} 
-
 assintoc_labels = {
     '0-constant': '1',
     '1-log': '\\log n',
@@ -124,85 +116,132 @@ assintoc_labels = {
     '6-quadratic': 'n^2',
     '7-quadratic-sqrt': 'n^2 \\sqrt{n}',
 }
+
+@njit(fastmath=True, cache=True)
+def assintotic_matrix_core(k, out):
+    """
+    Preenche out[j, i] com a j-ésima função assintótica avaliada em k[i],
+    na mesma ordem de assintoc_labels, calculando log e raiz uma única vez
+    """
+    for i in range(k.size):
+        ki = k[i]
+        lk = math.log(ki)
+        sk = math.sqrt(ki)
+        out[0, i] = 1.0              # 0-constant
+        out[1, i] = lk               # 1-log
+        out[2, i] = sk               # 05-sqrt
+        out[3, i] = ki               # 2-linear
+        out[4, i] = ki * lk          # 3-nlog
+        out[5, i] = ki * sk          # 4-nsqrt
+        out[6, i] = ki * lk * sk     # 5-nlogsqrt
+        out[7, i] = ki * ki          # 6-quadratic
+        out[8, i] = ki * ki * sk     # 7-quadratic-sqrt
+
+def assintotic_matrix(k):
+    """
+    Avalia todas as funções assintóticas em k, uma função por linha
+    """
+    k = np.asarray(k, dtype=np.float64)
+    out = np.empty((len(assintoc_labels), k.size))
+    assintotic_matrix_core(k, out)
+    return out
+
 occupations = df['occupation'].unique()
 
-for operation in operations:
-    for matrix_type in matrix_types:
-        subset = grouped[
-            (grouped['operation'] == operation) 
-            & (grouped['matrix_type'] == matrix_type) 
-        ]
-        subset = subset[subset['k'] > 1000] 
-        subset = rolling_outlier_filter(subset, column='avg_duration', sorted_by='k', n=10, threshold=1)
-        inf_subset = lim_inf_filter(subset, column='avg_duration', sorted_by='k', n=5, threshold=1)
-        sup_subset = lim_sup_filter(subset, column='avg_duration', sorted_by='k', n=5, threshold=1)
-
-        for assintotic_name, assintoc_function in assintoc_functions.items():
-            subset['f'] =  subset['avg_duration'] / assintoc_function(subset['k'])                
-            inf_subset['f'] =  inf_subset['avg_duration'] / assintoc_function(inf_subset['k'])                
-            sup_subset['f'] =  sup_subset['avg_duration'] / assintoc_function(sup_subset['k'])                
-            for occupation in occupations:
-                occ_subset = subset[subset['occupation'] == occupation]
-                plt.plot(occ_subset['k'], occ_subset['f'], 'o', markersize=4, alpha=0.4)
+def process_combo(operation, matrix_type, subset):
+    """
+    Gera e salva todos os gráficos de uma combinação (operação, tipo de matriz)
+    """
+    # Configurar gráfico (sem pyplot, para não carregar backend de GUI nos workers;
+    # layout restrito ajusta as margens à legenda abaixo do eixo a cada desenho)
+    fig = Figure(figsize=(12, 8), layout='constrained')
+    ax = fig.subplots()
+
+    subset = subset[subset['k'] > 1000].sort_values('k').reset_index(drop=True)
+    subset = rolling_outlier_filter(subset, column='avg_duration', sorted_by='k', n=10, threshold=1, already_sorted=True)
+    inf_subset = lim_inf_filter(subset, column='avg_duration', sorted_by='k', n=5, threshold=1, already_sorted=True)
+    sup_subset = lim_sup_filter(subset, column='avg_duration', sorted_by='k', n=5, threshold=1, already_sorted=True)
+
+    # Valores que não dependem da função assintótica
+    k = subset['k'].to_numpy()
+    inf_k = inf_subset['k'].to_numpy()
+    sup_k = sup_subset['k'].to_numpy()
+    f_matrix = subset['avg_duration'].to_numpy() / assintotic_matrix(k)
+    inf_f_matrix = inf_subset['avg_duration'].to_numpy() / assintotic_matrix(inf_k)
+    sup_f_matrix = sup_subset['avg_duration'].to_numpy() / assintotic_matrix(sup_k)
+    occupation_masks = {
+        occupation: (subset['occupation'] == occupation).to_numpy()
+        for occupation in occupations
+    }
+
+    for i, assintotic_name in enumerate(assintoc_labels):
+        f = f_matrix[i]
+        inf_f = inf_f_matrix[i]
+        sup_f = sup_f_matrix[i]
+        for occupation, occ_mask in occupation_masks.items():
+            ax.plot(k[occ_mask], f[occ_mask], 'o', markersize=4, alpha=0.4)
+    
+        slope, intercept, r = fast_linregress(k, f)
+        ax.plot(k, intercept + slope*k, '--', label=f"Linear Fit (r={r:.2f})")
         
-            slope, intercept, r, p, std_err = stats.linregress(subset['k'], subset['f'])
-            plt.plot(subset['k'], intercept + slope*subset['k'], '--', label=f"Linear Fit (r={r:.2f})")
-            
-            mean_f = (subset['f']*subset['k']).sum() / (subset['k'].sum())
-            plt.axhline(y=mean_f, color='gray', linestyle='--', alpha=0.5, label=f"Média Ponderada: {mean_f:.2e}")
-
-
-            
-            inf_smooth = plot_smooth_curve(inf_subset['k'], inf_subset['f'], window_length=7, polyorder=3)
-            sup_smooth = plot_smooth_curve(sup_subset['k'], sup_subset['f'], window_length=7, polyorder=3)
-            plt.plot(inf_subset['k'], inf_smooth, label="Infimum", color='blue', linewidth=2)
-            plt.plot(sup_subset['k'], sup_smooth, label="Supremum", color='red', linewidth=2)
-
-            
-            plt.ylim(bottom=0)
-            plt.xlabel('População')
-            plt.ylabel(f'Duração Média / ${assintoc_labels[assintotic_name]}$  (nano segundos)')
-            plt.title('Desempenho de Operações com Matrizes')
-            plt.legend(bbox_to_anchor=(0, -0.1), loc='upper left')
-            plt.grid(True, alpha=0.3)
-            plt.tight_layout()
-
-            # Mostrar gráfico
-            out_dir = os.path.join(str("graficos"), str(matrix_type), str(operation))
-            os.makedirs(out_dir, exist_ok=True)
-            outfile = os.path.join(out_dir, f"{assintotic_name}_matrix_performance.png")
-            plt.savefig(outfile)
-            plt.clf()
-            print(f"Gráfico salvo em: {outfile}")
-            
+        mean_f = (f*k).sum() / (k.sum())
+        ax.axhline(y=mean_f, color='gray', linestyle='--', alpha=0.5, label=f"Média Ponderada: {mean_f:.2e}")
+
+
+        
+        inf_smooth = plot_smooth_curve(inf_k, inf_f, window_length=7, polyorder=3)
+        sup_smooth = plot_smooth_curve(sup_k, sup_f, window_length=7, polyorder=3)
+        ax.plot(inf_k, inf_smooth, label="Infimum", color='blue', linewidth=2)
+        ax.plot(sup_k, sup_smooth, label="Supremum", color='red', linewidth=2)
+
         
-        subset['f'] =  subset['avg_duration']
-        subset['d'] = subset['size']*subset['size'] 
-        inf_subset = lim_inf_filter(subset, column='avg_duration', sorted_by='d', n=5, threshold=1)
-        sup_subset = lim_sup_filter(subset, column='avg_duration', sorted_by='d', n=5, threshold=1)
-        if len(inf_subset) < 5 or len(sup_subset) < 5:
-            continue
-        inf_smooth = plot_smooth_curve(inf_subset['d'], inf_subset['f'], window_length=7, polyorder=3)
-        sup_smooth = plot_smooth_curve(sup_subset['d'], sup_subset['f'], window_length=7, polyorder=3)
-        plt.plot(inf_subset['d'], inf_smooth, label="Infimum", color='blue', linewidth=2)
-        plt.plot(sup_subset['d'], sup_smooth, label="Supremum", color='red', linewidth=2)
-            
-        for occupation in occupations:
-            occ_subset = subset[subset['occupation'] == occupation]
-            plt.plot(occ_subset['d'], occ_subset['f'], 'o', markersize=4, alpha=0.4)
-
-        plt.ylim(bottom=0)
-        plt.xlabel('Elementos na Matriz (lado x lado)')
-        plt.ylabel(f'Duração Média (nano segundos)')
-        plt.title('Desempenho de Operações com Matrizes')
-        plt.legend(bbox_to_anchor=(0, -0.1), loc='upper left')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
+        ax.set_ylim(bottom=0)
+        ax.set_xlabel('População')
+        ax.set_ylabel(f'Duração Média / ${assintoc_labels[assintotic_name]}$  (nano segundos)')
+        ax.set_title('Desempenho de Operações com Matrizes')
+        ax.legend(bbox_to_anchor=(0, -0.1), loc='upper left')
+        ax.grid(True, alpha=0.3)
 
         # Mostrar gráfico
         out_dir = os.path.join(str("graficos"), str(matrix_type), str(operation))
         os.makedirs(out_dir, exist_ok=True)
-        outfile = os.path.join(out_dir, f"size_matrix_performance.png")
-        plt.savefig(outfile)
-        plt.clf()
-        print(f"Gráfico salvo em: {outfile}")
\ No newline at end of file
+        outfile = os.path.join(out_dir, f"{assintotic_name}_matrix_performance.png")
+        fig.savefig(outfile)
+        ax.cla()
+        print(f"Gráfico salvo em: {outfile}")
+        
+    
+    subset['f'] =  subset['avg_duration']
+    subset['d'] = subset['size']*subset['size'] 
+    inf_subset = lim_inf_filter(subset, column='avg_duration', sorted_by='d', n=5, threshold=1)
+    sup_subset = lim_sup_filter(subset, column='avg_duration', sorted_by='d', n=5, threshold=1)
+    if len(inf_subset) < 5 or len(sup_subset) < 5:
+        return
+    inf_smooth = plot_smooth_curve(inf_subset['d'], inf_subset['f'], window_length=7, polyorder=3)
+    sup_smooth = plot_smooth_curve(sup_subset['d'], sup_subset['f'], window_length=7, polyorder=3)
+    ax.plot(inf_subset['d'], inf_smooth, label="Infimum", color='blue', linewidth=2)
+    ax.plot(sup_subset['d'], sup_smooth, label="Supremum", color='red', linewidth=2)
+        
+    for occupation in occupations:
+        occ_subset = subset[subset['occupation'] == occupation]
+        ax.plot(occ_subset['d'], occ_subset['f'], 'o', markersize=4, alpha=0.4)
+
+    ax.set_ylim(bottom=0)
+    ax.set_xlabel('Elementos na Matriz (lado x lado)')
+    ax.set_ylabel(f'Duração Média (nano segundos)')
+    ax.set_title('Desempenho de Operações com Matrizes')
+    ax.legend(bbox_to_anchor=(0, -0.1), loc='upper left')
+    ax.grid(True, alpha=0.3)
+
+    # Mostrar gráfico
+    out_dir = os.path.join(str("graficos"), str(matrix_type), str(operation))
+    os.makedirs(out_dir, exist_ok=True)
+    outfile = os.path.join(out_dir, f"size_matrix_performance.png")
+    fig.savefig(outfile)
+    print(f"Gráfico salvo em: {outfile}")
+
+# Cada combinação é independente: gera os gráficos em processos separados
+Parallel(n_jobs=-1, backend='loky')(
+    delayed(process_combo)(operation, matrix_type, subset)
+    for (operation, matrix_type), subset in grouped.groupby(['operation', 'matrix_type'], sort=False)
+)
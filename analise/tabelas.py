@@ -1,47 +1,50 @@
-import json
+import orjson
 import os
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 # Carrega e processa dados
-with open(input(), 'r') as f:
-    data = json.load(f)
+with open(input(), 'rb') as f:
+    data = orjson.loads(f.read())
 
-# Cria DataFrame e processa durações
+# Cria tabela Arrow e processa durações
 df = pd.json_normalize(data, 'durations', ['matrix_type', 'i', 'population', 'operation'])
-df['total_ns'] = df['secs'] * 1e9 + df['nanos']
+tbl = pa.Table.from_pandas(df, preserve_index=False)
+tbl = tbl.append_column('total_ns', pc.add(pc.multiply(tbl['secs'], 1_000_000_000), tbl['nanos']))
 
-# Função de conversão
+# Função de conversão (vetorizada: escolhe a maior unidade com valor >= 1)
+units = np.array(['ns', 'µs', 'ms', 's'])
+factors = np.array([1, 1e3, 1e6, 1e9])
 def format_duration(ns):
-    for unit, factor in [('s', 1e9), ('ms', 1e6), ('µs', 1e3), ('ns', 1)]:
-        if ns >= factor or unit == 'ns':
-            return f"{ns/factor:.3f} {unit}"
+    ns = np.asarray(ns, dtype=np.float64)
+    unit = np.clip(np.searchsorted(factors, ns, side='right') - 1, 0, len(factors) - 1)
+    text = np.char.add(np.char.mod('%.3f ', ns / factors[unit]), units[unit])
+    return np.where(np.isnan(ns), None, text)
 
-# Agrupa e formata
-result = (df.groupby(['operation', 'matrix_type', 'i', 'population'])['total_ns']
-          .mean()
-          .reset_index())
-result['duration'] = result['total_ns'].apply(format_duration)
-def cast(x):
-    if x % 1 < 0.000001:
-        return f"{int(x)}"
-    return f"{x}"
+# Agrupa (média por tipo de matriz) no Arrow; o pandas só reorganiza em tabela
+result = (tbl.group_by(['operation', 'matrix_type', 'i', 'population'])
+          .aggregate([('total_ns', 'mean')])
+          .to_pandas()
+          .pivot(index=['operation', 'i', 'population'], columns='matrix_type', values='total_ns_mean'))
 # Gera tabelas
-for operation in result['operation'].unique():
-    op_data = result[result['operation'] == operation]
-    
-    pivot_table = (op_data.pivot_table(
-        index=['i', 'population'],
-        columns='matrix_type',
-        values='duration',
-        aggfunc='first'
-    )
+for operation in result.index.unique('operation'):
+    op_data = result.loc[operation].dropna(axis=1, how='all')
+    pivot_table = (pd.DataFrame(format_duration(op_data.to_numpy()), index=op_data.index, columns=op_data.columns)
     .sort_index()
+    .sort_index(axis=1)
     .reset_index())
     
 
-    pivot_table["percentage"] = (100 * pivot_table["population"] / np.pow(10, 2*pivot_table["i"].astype(int))).apply(lambda x: cast(x) + r"\%")
-    pivot_table['i'] = pivot_table['i'].apply(lambda x: f"$10^{x}$x$10^{x}$")
+    # Ocupação em %, sem casas decimais quando o valor é inteiro
+    i_int = pivot_table["i"].astype(int).to_numpy()
+    pow10 = 10.0 ** (2 * np.arange(i_int.max() + 1))
+    percentage = 100 * pivot_table["population"] / pow10[i_int]
+    is_int = (percentage % 1) < 0.000001
+    pivot_table["percentage"] = percentage.astype(int).astype(str).where(is_int, percentage.astype(str)) + r"\%"
+    i = pivot_table['i'].astype(str)
+    pivot_table['i'] = "$10^" + i + "$x$10^" + i + "$"
     cols = ["i", "percentage"] + [col for col in pivot_table.columns if col not in ['i', 'percentage']]
 
     latex = pivot_table[cols].fillna('').to_latex(